@@ -1,12 +1,45 @@
+import functools
+import hashlib
 import logging
 import os
-import json
+import orjson
+import re
 from crewai import Agent, Task, Crew, Process, LLM
 import asyncio
+from pathlib import Path
 from typing import List, Dict
-from fine_voicing.tools.constants import LOGGER_MAIN, TEST_CASES_DIR, LOGGER_TEST_CASE_FILE_PATTERN, ULTRAVOX_FIRST_SPEAKER_USER, EMPTY_HISTORY
+from fine_voicing.tools.constants import LOGGER_MAIN, TEST_CASES_DIR, LOGGER_TEST_CASE_FILE_PATTERN, ULTRAVOX_FIRST_SPEAKER_USER
 from fine_voicing.tools.voice_ai_model_thread import VoiceAIModelThread, Provider
 from fine_voicing.tools import utils, voice_ai
+from fine_voicing.tools.cache import ResponseCache
+
+# The moderator is asked to answer 'continue' or 'terminate' up front, so only
+# the head of its output needs scanning
+_TERMINATE_RE = re.compile(r'\bterminate\b', re.IGNORECASE)
+
+# Strips markdown code fences the role generator sometimes wraps JSON in
+_CODE_FENCE_RE = re.compile(r"^```(?:json)?\n?|\n?```$", re.M)
+
+MODERATE_TASK_DESCRIPTION = (
+    "Decide if pursuing the conversation would be useful, based on the conversation history."
+    "Answer clearly: continue OR terminate."
+    "Provide reasoning for the decision."
+    "Always write in English"
+    "Chat history, each message is prefixed with a dash (-):"
+    "{chat_history}"
+)
+
+@functools.lru_cache(maxsize=64)
+def _build_testing_task_description(role_name: str, role_prompt: str, language: str) -> str:
+    return (
+        "Generate the next message in the conversation, based on the chat history."
+        f"Play role in the conversation: {role_name}."
+        f"Follow these instructions: {role_prompt}."
+        f"Prefix all messages with the role name: {role_name}."
+        f"Ensure the response is in {language} and adheres to the context of the conversation."
+        "Chat history, each message is prefixed with a dash (-):"
+        "{chat_history}"
+    )
 
 class FineVoicingAgent(Agent):
     def __init__(self, *args, **kwargs):
@@ -14,36 +47,55 @@ class FineVoicingAgent(Agent):
         self._logger = kwargs.get('logger', logging.getLogger(LOGGER_MAIN))
 
 class TestRunner:
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, concurrency: int = None):
         self.debug = debug
         self.logger = logging.getLogger(LOGGER_MAIN)
         self.test_case_loggers = {}
         self.test_case_definitions = {}
+        self._sem = asyncio.Semaphore(concurrency or int(os.getenv("FV_CONCURRENCY", "8")))
+        self._has_openrouter = bool(os.getenv('OPENROUTER_API_KEY'))
+        self._llms = self._setup_llms()
+        self._moderate_crew = self._setup_moderate_crew()
+        self._response_cache = ResponseCache(logger=self.logger)
+        self._roles_cache = {}
 
     async def run_test_cases(self, test_dir: str = TEST_CASES_DIR) -> Dict[str, List[str]]:
         test_cases_dir = os.path.join(os.path.dirname(__file__), test_dir)
-        test_case_files = [os.path.join(test_cases_dir, f) for f in os.listdir(test_cases_dir) if os.path.isfile(os.path.join(test_cases_dir, f)) and not f.endswith('example.json')]
-        
+        with os.scandir(test_cases_dir) as it:
+            entries = [(os.path.splitext(entry.name)[0], entry.path) for entry in it if entry.is_file(follow_symlinks=False) and entry.name.endswith('.json') and not entry.name.endswith('example.json')]
+
         transcripts = {}
         tasks = []
 
-        for test_case_file in test_case_files:
-            test_case_name = os.path.splitext(os.path.basename(test_case_file))[0]
+        # Read all definition files concurrently on the thread pool
+        definitions = await asyncio.gather(*(asyncio.to_thread(Path(test_case_file).read_bytes) for _, test_case_file in entries))
+
+        # Identical definitions run once; their transcript is shared by alias
+        aliases = {}
+        seen_definitions = {}
+
+        for (test_case_name, _), definition in zip(entries, definitions):
             self.test_case_loggers[test_case_name] = utils.setup_logging(test_case_name, debug=self.debug, file_pattern=LOGGER_TEST_CASE_FILE_PATTERN, test_case_name=test_case_name, console_output=False)
-            with open(test_case_file) as f:
-                test_case = json.load(f)
-                self.test_case_definitions[test_case_name] = test_case
-                self.logger.info(f"--- Test case: {test_case_name} submitted for execution ---")
-                tasks.append(self.run_test_case(test_case_name))
-        
-        results = await asyncio.gather(*tasks)
-        
-        for test_case_name, transcript in zip([os.path.splitext(os.path.basename(f))[0] for f in test_case_files], results):
-            transcripts[test_case_name] = transcript
-            self.logger.info(f"--- Transcript for test case: {test_case_name} ---")
-            [self.logger.info(line) for line in transcript]
-            self.logger.info(f"--- End transcript for test case: {test_case_name} ---")
-            self.logger.info(f"--- Test case: {test_case_name} completed ---")
+            test_case = orjson.loads(definition)
+            self.test_case_definitions[test_case_name] = test_case
+            definition_key = hashlib.blake2b(orjson.dumps(test_case, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+            if definition_key in seen_definitions:
+                aliases[seen_definitions[definition_key]].append(test_case_name)
+                self.logger.info(f"--- Test case: {test_case_name} is identical to {seen_definitions[definition_key]}, sharing its run ---")
+                continue
+            seen_definitions[definition_key] = test_case_name
+            aliases[test_case_name] = [test_case_name]
+            self.logger.info(f"--- Test case: {test_case_name} submitted for execution ---")
+            tasks.append(asyncio.create_task(self._run_named(test_case_name)))
+
+        # Stream results as each case finishes instead of waiting for the
+        # whole batch before logging any transcript
+        for completed in asyncio.as_completed(tasks):
+            test_case_name, transcript = await completed
+            for alias in aliases[test_case_name]:
+                transcripts[alias] = transcript
+                self.logger.info("--- Transcript for test case: %s ---\n%s\n--- End transcript for test case: %s ---", alias, "\n".join(transcript), alias)
+                self.logger.info(f"--- Test case: {alias} completed ---")
 
         return transcripts
     
@@ -88,54 +140,68 @@ class TestRunner:
             )
         }
 
+    def _setup_moderate_crew(self) -> Crew:
+        # The moderation task is fully static ({chat_history} is interpolated
+        # at kickoff), so one prototype crew is built up front and copied per
+        # kickoff in _moderate; its logs go to the main logger.
+        moderator = FineVoicingAgent(
+            role="Conversation Moderator",
+            goal="Evaluate each message in the conversation and decide if the conversation should continue.",
+            verbose=self.debug,
+            memory=False,
+            backstory="You are an expert in evaluating and moderating conversations.",
+            logger=self.logger,
+            **({ 'llm': self._llms['qwen_2_5_7b_instruct'] } if self._has_openrouter else {})
+        )
+
+        moderate_task = Task(
+            description=MODERATE_TASK_DESCRIPTION,
+            expected_output="A decision to 'continue' or 'terminate', with reasoning.",
+            agent=moderator,
+        )
+
+        return Crew(
+            agents=[moderator],
+            tasks=[moderate_task],
+        )
+
     def _setup_agents(self, test_case_name: str) -> Dict[str, FineVoicingAgent]:
-        llms = self._setup_llms()
+        llms = self._llms
         logger = self.test_case_loggers[test_case_name]
         
         voice_ai_model_agent = FineVoicingAgent(
             role="Voice AI Model Agent",
             goal="Use the Voice AI Model to generate conversations.",
-            verbose=True,
+            verbose=self.debug,
             memory=False,
             backstory="You specialize in using Voice AI Models to generate conversational messages.",
             logger=logger,
-            **({ 'llm': llms['qwen_2_5_72b_instruct'] } if os.getenv('OPENROUTER_API_KEY') else {})
+            **({ 'llm': llms['qwen_2_5_72b_instruct'] } if self._has_openrouter else {})
         )
 
         conversation_generator = FineVoicingAgent(
             role="Conversation Voice Simulation Agent",
             goal="Generate conversational messages in a voice conversation with an AI assistant.",
-            verbose=True,
+            verbose=self.debug,
             memory=False,
             backstory="You specialize in simulating human-like voice interactions, and refining AI prompts.",
             logger=logger,
-            **({ 'llm': llms['qwen_2_5_72b_instruct'] } if os.getenv('OPENROUTER_API_KEY') else {})
-        )
-
-        moderator = FineVoicingAgent(
-            role="Conversation Moderator",
-            goal="Evaluate each message in the conversation and decide if the conversation should continue.",
-            verbose=True,
-            memory=False,
-            backstory="You are an expert in evaluating and moderating conversations.",
-            logger=logger,
-            **({ 'llm': llms['qwen_2_5_7b_instruct'] } if os.getenv('OPENROUTER_API_KEY') else {})
+            **({ 'llm': llms['qwen_2_5_72b_instruct'] } if self._has_openrouter else {})
         )
 
         conversation_roles_agent = FineVoicingAgent(
             role="Conversation Roles Generator",
             goal="Generate the roles and instructions for a conversation based on the provided instructions.",
-            verbose=True,
+            verbose=self.debug,
             memory=False,
             backstory="You specialize in generating the roles and instructions for a conversation based on the provided instructions.",
             logger=logger,
-            **({ 'llm': llms['qwen_2_5_coder_32b_instruct'] } if os.getenv('OPENROUTER_API_KEY') else {})
+            **({ 'llm': llms['qwen_2_5_coder_32b_instruct'] } if self._has_openrouter else {})
         )
 
         return {
             'voice_ai_model_agent': voice_ai_model_agent,
             'conversation_generator': conversation_generator,
-            'moderator': moderator,
             'conversation_roles_agent': conversation_roles_agent
         }
 
@@ -161,14 +227,40 @@ class TestRunner:
         )
 
         logger.info("Generating conversation roles and instructions")
+        # Keyed on the instructions alone: the parsed roles are stored, so a
+        # repeat never re-pays the LLM call or a flaky parse
+        cache_key = ResponseCache.make_key(test_case['instructions'])
+        roles = self._roles_cache.get(cache_key)
+        if roles is not None:
+            logger.info(f"Conversation Roles (cached): {roles}")
+            return roles
+
         sRoles = generate_roles_crew.kickoff(test_case)
         logger.info(f"Conversation Roles: {sRoles}")
 
-        roles = json.loads(str(sRoles))
+        if getattr(sRoles, 'json_dict', None):
+            roles = sRoles.json_dict
+        else:
+            raw = sRoles.raw if hasattr(sRoles, 'raw') else str(sRoles)
+            try:
+                roles = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                # The model occasionally fences the JSON despite the prompt
+                roles = orjson.loads(_CODE_FENCE_RE.sub('', raw).strip())
         logger.debug(f"JSON deserialized roles: {roles}")
 
+        self._roles_cache[cache_key] = roles
         return roles
 
+    async def _run_named(self, test_case_name):
+        return test_case_name, await self._run_with_sem(test_case_name)
+
+    async def _run_with_sem(self, test_case_name):
+        # Bound the fan-out so a large test-cases directory doesn't hammer the
+        # LLM providers' rate limits all at once
+        async with self._sem:
+            return await self.run_test_case(test_case_name)
+
     async def run_test_case(self, test_case_name):
         logger = self.test_case_loggers[test_case_name]
         test_case = self.test_case_definitions[test_case_name]
@@ -179,20 +271,9 @@ class TestRunner:
         logger.debug(f"Test case definition: {test_case}")
         
         try:
-            moderate_task = Task(
-            description=(
-                    "Decide if pursuing the conversation would be useful, based on the conversation history."
-                    "Answer clearly: continue OR terminate."
-                    "Provide reasoning for the decision."
-                    "Always write in English"
-                    "Chat history, each message is prefixed with a dash (-):"
-                    "{chat_history}"
-                ),
-                expected_output="A decision to 'continue' or 'terminate', with reasoning.",
-                agent=agents['moderator'],
-            )
-
-            roles = self._generate_roles(agents, test_case_name)
+            # kickoff is synchronous; run it on the thread pool so sibling
+            # test cases keep progressing while roles are generated
+            roles = await asyncio.to_thread(self._generate_roles, agents, test_case_name)
 
             tested_role = roles['tested_role']
             testing_role = roles['testing_role']
@@ -204,15 +285,7 @@ class TestRunner:
             voiceai_thread = VoiceAIModelThread(tested_role['role_prompt'], logger, provider=provider, first_speaker=ULTRAVOX_FIRST_SPEAKER_USER)
 
             generate_task_testing = Task(
-                description=(
-                    "Generate the next message in the conversation, based on the chat history." 
-                    f"Play role in the conversation: {testing_role['role_name']}."
-                    f"Follow these instructions: {testing_role['role_prompt']}."
-                    f"Prefix all messages with the role name: {testing_role['role_name']}."
-                    f"Ensure the response is in {test_case['language']} and adheres to the context of the conversation."
-                    "Chat history, each message is prefixed with a dash (-):"
-                    "{chat_history}"
-                ),
+                description=_build_testing_task_description(testing_role['role_name'], testing_role['role_prompt'], test_case['language']),
                 expected_output="A single conversational message, responding to the previous message.",
                 agent=agents['conversation_generator'],
             )
@@ -220,7 +293,6 @@ class TestRunner:
             tasks = {
                 #'generate_task_tested': generate_task_tested,
                 'generate_task_testing': generate_task_testing,
-                'moderate_task': moderate_task
             }
 
             transcript = await self._converse(test_case_name, voiceai_thread, agents, tasks, roles)
@@ -239,44 +311,69 @@ class TestRunner:
             process=Process.sequential
         )
 
-        moderate_crew = Crew(
-            agents=[agents['moderator']],
-            tasks=[tasks['moderate_task']],
-        )
-
         transcript = []
+        formatted_lines = []
         should_terminate = False
         index_turn = 1
-        run_next_turn = True
-        while run_next_turn:
+        moderation_task = None
+        while True:
             logger.info(f"--- Starting turn {index_turn} ---")
 
+            # Messages appended from here on are speculative until the pending
+            # moderation decision (for the previous turn) is known.
+            speculative_start = len(transcript)
+
             last_message = transcript[-1] if len(transcript) > 0 else ""
-            message = voiceai_thread.send_message(last_message)
+            message = await voiceai_thread.send_message_async(last_message)
             transcript.append(f"{roles['tested_role']['role_name']}: {message}")
+            formatted_lines.append(f"- {transcript[-1]}")
 
-            result_testing = await generate_testing_crew.kickoff_async({"chat_history": self._format_transcript(transcript)})
+            result_testing = await generate_testing_crew.kickoff_async({"chat_history": "\n".join(formatted_lines)})
             transcript.append(result_testing.raw)
+            formatted_lines.append(f"- {result_testing.raw}")
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("--- Turn %d conversation transcript ---\n%s\n--- End of turn %d conversation transcript ---", index_turn, "\n".join(transcript), index_turn)
+
+            # The moderation decision for turn N only gates turn N+1, so the
+            # moderator runs in the background while the next turn is generated.
+            if moderation_task is not None:
+                decision = await moderation_task
+                logger.info(f"Moderation Decision: {decision}")
+
+                # Check if the moderator wants to terminate the conversation
+                decision_str = str(decision)
+                should_terminate = bool(_TERMINATE_RE.search(decision_str[:256]))
+                if should_terminate:
+                    # Discard the speculative turn generated while moderating
+                    del transcript[speculative_start:]
+                    del formatted_lines[speculative_start:]
+                    logger.debug(f"Conversation terminated by moderator after {index_turn - 1} turns")
+                    break
+                logger.debug(f"Conversation continuing after {index_turn - 1} turns")
 
-            logger.debug(f"--- Turn {index_turn} conversation transcript ---")
-            [logger.debug(line) for line in transcript]
-            logger.debug(f"--- End of turn {index_turn} conversation transcript ---")
-            
-            # Moderate message
             logger.info(f"--- Turn {index_turn}: Moderating conversation ---")
-            decision = await moderate_crew.kickoff_async({"chat_history": self._format_transcript(transcript)})
-            logger.info(f"Moderation Decision: {decision}")
-            
-            # Check if the moderator wants to terminate the conversation
-            decision_str = str(decision)
-            should_terminate = "terminate" in decision_str.lower()
-            logger.debug(f"Conversation terminated by moderator after {index_turn} turns") if should_terminate else logger.debug(f"Conversation continuing after {index_turn} turns")
+            moderation_task = asyncio.create_task(self._moderate(test_case_name, list(formatted_lines)))
+
             logger.info(f"--- Ending turn {index_turn} ---")
             index_turn += 1
-            run_next_turn = not should_terminate and index_turn <= test_case['turns']
+            if index_turn > test_case['turns']:
+                decision = await moderation_task
+                logger.info(f"Moderation Decision: {decision}")
+                break
 
         logger.info("Conversation terminated by moderator") if should_terminate else logger.info(f"Conversation completed after {index_turn-1} turns")
         return transcript
     
-    def _format_transcript(self, transcript: List[str] | str) -> str:
-        return "\n".join(f"- {line}" for line in transcript) if len(transcript) > 0 else EMPTY_HISTORY
\ No newline at end of file
+    async def _moderate(self, test_case_name: str, formatted_lines: List[str]) -> str:
+        # Keyed on the tail of the history so near-identical turns replay the
+        # cached decision instead of re-prompting the moderator
+        key = ResponseCache.make_key(test_case_name, *formatted_lines[-2:])
+        decision = self._response_cache.get(key)
+        if decision is None:
+            # kickoff interpolates {chat_history} by mutating the crew's task,
+            # so concurrent moderations each run on a copy of the prototype
+            # crew rather than racing on the shared instance
+            decision = str(await self._moderate_crew.copy().kickoff_async({"chat_history": "\n".join(formatted_lines)}))
+            self._response_cache.put(key, decision)
+        return decision
\ No newline at end of file
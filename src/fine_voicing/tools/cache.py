@@ -0,0 +1,37 @@
+import hashlib
+import logging
+from fine_voicing.tools.constants import LOGGER_MAIN
+
+class ResponseCache:
+    """In-memory exact-match cache for LLM call results.
+
+    Role generation and moderation often see duplicate inputs across test
+    cases and turns; caching their outputs short-circuits the LLM round-trip
+    on a repeat. Keys are hashes of the call inputs, values are whatever the
+    caller wants replayed.
+    """
+    def __init__(self, logger: logging.Logger = logging.getLogger(LOGGER_MAIN)):
+        self.logger = logger
+        self._store = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else str(part).encode())
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        value = self._store.get(key)
+        if value is not None:
+            self.hits += 1
+            self.logger.info(f"Response cache hit ({self.hits} hits, {self.misses} misses)")
+        else:
+            self.misses += 1
+        return value
+
+    def put(self, key: str, value):
+        self._store[key] = value
@@ -6,12 +6,12 @@ TEST_CASES_DIR='../../test-cases'
 OPENAI_REALTIME_BASE_URL = "wss://api.openai.com/v1/realtime"
 OPENAI_REALTIME_DEFAULT_MODEL = "gpt-4o-realtime-preview-2024-10-01"
 OPENAI_REALTIME_DEFAULT_VOICE = "alloy"
-OPENAI_OBSERVED_EVENTS = ['response.done', 'error']
+OPENAI_OBSERVED_EVENTS = frozenset({'response.done', 'error'})
 
 ULTRAVOX_BASE_URL = "https://api.ultravox.ai"
 ULTRAVOX_DEFAULT_MODEL = 'fixie-ai/ultravox'
 ULTRAVOX_DEFAULT_VOICE = 'Mark'
-ULTRAVOX_OBSERVED_EVENTS = ['transcript']
+ULTRAVOX_OBSERVED_EVENTS = frozenset({'transcript'})
 
 ULTRAVOX_FIRST_SPEAKER_USER = 'FIRST_SPEAKER_USER'
 ULTRAVOX_FIRST_SPEAKER_AGENT = 'FIRST_SPEAKER_AGENT'
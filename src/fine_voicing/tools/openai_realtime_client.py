@@ -1,9 +1,35 @@
+import asyncio
 import logging
 import os
-import json
+import socket
+import re
+import orjson
 import websockets
 from fine_voicing.tools.constants import LOGGER_MAIN, OPENAI_REALTIME_BASE_URL, OPENAI_REALTIME_DEFAULT_MODEL, OPENAI_REALTIME_DEFAULT_VOICE, OPENAI_OBSERVED_EVENTS, ULTRAVOX_FIRST_SPEAKER_USER
-    
+
+# The response.create payload never varies, so it is serialized once at import
+_RESPONSE_CREATE = orjson.dumps({
+    "type": "response.create",
+    "response": {
+        "modalities": ["text"]
+    }
+}).decode()
+
+# Only the text field of conversation.item.create varies, so the envelope is
+# a prebuilt template and orjson escapes just the message itself
+_ITEM_CREATE_PREFIX = b'{"type":"conversation.item.create","item":{"type":"message","role":"user","content":[{"type":"input_text","text":'
+_ITEM_CREATE_SUFFIX = b'}]}}'
+
+# Realtime frames put "type" first, so a single anchored scan of the raw frame
+# yields the event type without a full JSON parse
+_TYPE_RE = re.compile(r'"type"\s*:\s*"([^"]+)"')
+
+# How long to wait for the next frame before giving up on the response
+_RECV_TIMEOUT = int(os.getenv("FV_REALTIME_RECV_TIMEOUT", "30"))
+
+# Streaming events whose delta fields accumulate into the response text
+_DELTA_EVENTS = frozenset({'response.text.delta', 'response.output_text.delta'})
+
 class OpenAIRealtimeClient():
     def __init__(
         self, 
@@ -31,6 +57,9 @@ class OpenAIRealtimeClient():
         self.session_updated = False
         self.ws = None
         self.first_speaker = first_speaker
+        # Serialized once up front; reset_session rebuilds it if the
+        # instructions change mid-connection
+        self.reset_session()
     async def connect(self):
         """Establish WebSocket connection with OpenAI Realtime API."""
         if not self.ws:
@@ -43,9 +72,28 @@ class OpenAIRealtimeClient():
             self.ws = await websockets.connect(
                 f"{OPENAI_REALTIME_BASE_URL}?model={self.model}",
                 additional_headers=headers,
-                ping_interval=None,
+                ping_interval=20,
+                ping_timeout=10,
+                max_queue=32,
+                max_size=2**20,
+                # Large write buffer so bursts of outbound frames flush in
+                # fewer wakeups; inbound buffering is governed by max_queue
+                write_limit=2**20,
+                # Frames are small, unique JSON: permessage-deflate would cost
+                # a zlib pass per delta frame for no real byte savings
+                compression=None,
                 logger=self.logger
             )
+            self._disable_nagle()
+
+    def _disable_nagle(self):
+        """Set TCP_NODELAY so tiny JSON frames aren't delayed by Nagle."""
+        try:
+            sock = self.ws.transport.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except (OSError, AttributeError):
+            self.logger.debug("Could not set TCP_NODELAY on the websocket")
 
     async def disconnect(self):
         if self.ws:
@@ -53,25 +101,36 @@ class OpenAIRealtimeClient():
             await self.ws.close()
             self.ws = None
 
+    def reset_session(self, instructions: str = None):
+        """Repoint the session at new instructions without dropping the socket.
+
+        Rebuilding the session payload and letting the next update_session
+        push it reuses the established TCP/TLS connection instead of paying
+        a full reconnect handshake.
+        """
+        if instructions is not None:
+            self.instructions = instructions
+        self._session_update = orjson.dumps({
+            "type": "session.update",
+            "session": {
+                "turn_detection": None,
+                "voice": self.voice,
+                "instructions": self.instructions,
+                "modalities": ["text"],
+                "temperature": 0.7
+            }
+        }).decode()
+        self.session_updated = False
+
     async def update_session(self):
         if not self.session_updated:
-            session_config = {
-                "type": "session.update",
-                "session": {
-                    "turn_detection": None,
-                    "voice": self.voice,
-                    "instructions": self.instructions,
-                    "modalities": ["text"],
-                    "temperature": 0.7
-                }
-            }
-            await self.ws.send(json.dumps(session_config))
+            await self.ws.send(self._session_update)
 
             # Wait for session.update.completed event
             while True:
                 response = await self.ws.recv()
-                data = json.loads(response)
-                self.logger.debug(f'Session update response: {data}')
+                data = orjson.loads(response)
+                self.logger.debug('Session update response: %s', data)
                 
                 if data.get("type") == "session.updated":
                     break
@@ -85,53 +144,74 @@ class OpenAIRealtimeClient():
         """Send a message through the WebSocket connection synchronously."""
         self.logger.info(f"Sending message to OpenAI: {message}")
         
-        conversation_event = {
-            "type": "conversation.item.create",
-            "item": {
-                "type": "message",
-                "role": "user",
-                "content": [{
-                    "type": "input_text",
-                    "text": message
-                }]
-            }
-        }
-        # Request response creation
-        response_event = {
-            "type": "response.create",
-            "response": {
-                "modalities": ["text"]
-            }
-        }
-        await self.ws.send(json.dumps(conversation_event))
-        await self.ws.send(json.dumps(response_event))
+        conversation_event = _ITEM_CREATE_PREFIX + orjson.dumps(message) + _ITEM_CREATE_SUFFIX
+        payload = conversation_event.decode()
 
         full_response = ""
-        try:
-            while True:
-                response = await self.ws.recv()
-                data = json.loads(response)
-                event_type = data.get("type")
-
-                if event_type in OPENAI_OBSERVED_EVENTS:
-                    self.logger.debug(f'Received event from OpenAI: {data}')
-
-                    if event_type == "response.done":
-                        response = data.get("response")
-                        response_status = response.get("status")
-                        if response_status == 'completed':
-                            full_response = response['output'][0]['content'][0]['text']
-                            self.logger.info(f"Response from OpenAI: {full_response}")
-                        else:
-                            self.logger.info(f"Error in the response from OpenAI")
-                            full_response = '<Error>'
-                        break
-                    elif event_type == "error":
-                        error_message = data.get("error", {}).get("message", "Unknown error")
-                        self.logger.error(f"Error from OpenAI Realtime API: {error_message}")
-                        raise Exception(f"OpenAI Realtime API error: {error_message}")
-                        
-        except websockets.exceptions.ConnectionClosed:
-            self.logger.warning("WebSocket connection closed")
-            
+        streamed_parts = []
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        for attempt in range(2):
+            try:
+                # A previous timeout or failed reconnect tore the socket down;
+                # re-establish it before sending
+                if self.ws is None:
+                    await self.connect()
+                    await self.update_session()
+                # Queue both frames into the same write without yielding in
+                # between so they coalesce on the wire
+                await asyncio.gather(self.ws.send(payload), self.ws.send(_RESPONSE_CREATE))
+
+                while True:
+                    try:
+                        response = await asyncio.wait_for(self.ws.recv(), timeout=_RECV_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        self.logger.error(f"No frame from OpenAI within {_RECV_TIMEOUT}s, abandoning the response")
+                        # Treat the connection as dead so the next call
+                        # reconnects instead of waiting on a stalled socket
+                        await self.ws.close()
+                        self.ws = None
+                        self.session_updated = False
+                        return full_response
+                    # Most frames are delta events we discard; extract just the
+                    # event type from the raw frame and only JSON-parse the
+                    # observed ones (or everything when debug logging is on)
+                    m = _TYPE_RE.search(response)
+                    event_type = m.group(1) if m else None
+                    if event_type in _DELTA_EVENTS:
+                        # Accumulate the streamed text so the terminal event
+                        # doesn't need re-traversing the full response payload
+                        streamed_parts.append(orjson.loads(response).get("delta", ""))
+                        continue
+                    if not debug_enabled and event_type not in OPENAI_OBSERVED_EVENTS:
+                        continue
+                    data = orjson.loads(response)
+                    event_type = data.get("type")
+
+                    if event_type in OPENAI_OBSERVED_EVENTS:
+                        self.logger.debug('Received event from OpenAI: %s', data)
+
+                        if event_type == "response.done":
+                            response = data.get("response")
+                            response_status = response.get("status")
+                            if response_status == 'completed':
+                                full_response = "".join(streamed_parts) if streamed_parts else response['output'][0]['content'][0]['text']
+                                self.logger.info(f"Response from OpenAI: {full_response}")
+                            else:
+                                self.logger.info(f"Error in the response from OpenAI")
+                                full_response = '<Error>'
+                            return full_response
+                        elif event_type == "error":
+                            error_message = data.get("error", {}).get("message", "Unknown error")
+                            self.logger.error(f"Error from OpenAI Realtime API: {error_message}")
+                            raise Exception(f"OpenAI Realtime API error: {error_message}")
+
+            except websockets.exceptions.ConnectionClosed:
+                self.logger.warning("WebSocket connection closed")
+                self.ws = None
+                self.session_updated = False
+                streamed_parts.clear()
+                if attempt == 0:
+                    # The next attempt reconnects via the guard above
+                    self.logger.info("Reconnecting to OpenAI and resending the last message")
+
         return full_response
\ No newline at end of file
@@ -1,10 +1,22 @@
 import logging
 import os
-import json
+import socket
+import orjson
 import websockets
 import aiohttp
 from fine_voicing.tools.constants import LOGGER_MAIN, ULTRAVOX_BASE_URL, ULTRAVOX_DEFAULT_MODEL, ULTRAVOX_DEFAULT_VOICE, ULTRAVOX_FIRST_SPEAKER_USER, ULTRAVOX_OBSERVED_EVENTS
 
+# The output-medium payload never varies, so it is serialized once at import
+_SET_OUTPUT_MEDIUM = orjson.dumps({
+    "type": "set_output_medium",
+    "medium": "text"
+}).decode()
+
+# Only the text field of input_text_message varies, so the envelope is a
+# prebuilt template and orjson escapes just the message itself
+_INPUT_TEXT_PREFIX = b'{"type":"input_text_message","text":'
+_INPUT_TEXT_SUFFIX = b'}'
+
 class UltraVoxClient():
     def __init__(
         self, 
@@ -32,6 +44,7 @@ class UltraVoxClient():
         self.session_updated = False
         self.ws = None
         self.first_speaker = first_speaker
+        self._http = None
     async def connect(self):
         """Establish WebSocket connection with Ultravox."""
         if not self.ws:
@@ -40,22 +53,40 @@ class UltraVoxClient():
             
             self.ws = await websockets.connect(
                 join_url,
+                max_queue=32,
+                max_size=2**20,
+                # Large write buffer so bursts of outbound frames flush in
+                # fewer wakeups; inbound buffering is governed by max_queue
+                write_limit=2**20,
+                # Frames are small, unique JSON: permessage-deflate would cost
+                # a zlib pass per frame for no real byte savings
+                compression=None,
                 logger=self.logger
             )
+            self._disable_nagle()
 
-            set_output_medium = {
-                "type": "set_output_medium",
-                "medium": "text"
-            }
-            await self.ws.send(json.dumps(set_output_medium))
+            await self.ws.send(_SET_OUTPUT_MEDIUM)
+
+    def _disable_nagle(self):
+        """Set TCP_NODELAY so tiny JSON frames aren't delayed by Nagle."""
+        try:
+            sock = self.ws.transport.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except (OSError, AttributeError):
+            self.logger.debug("Could not set TCP_NODELAY on the websocket")
 
     async def _fetch_join_url(self):
         url = f'{ULTRAVOX_BASE_URL}/api/calls'
-        headers = {
-            'X-API-Key': self.api_key,
-            'Content-Type': 'application/json'
-        }
-        
+
+        # One session per client, reused across reconnects, so the connector
+        # and TLS context aren't rebuilt on every join-URL fetch
+        if self._http is None:
+            self._http = aiohttp.ClientSession(headers={
+                'X-API-Key': self.api_key,
+                'Content-Type': 'application/json'
+            })
+
         payload = {
             "systemPrompt": self.instructions,
             "model": self.model,
@@ -70,17 +101,19 @@ class UltraVoxClient():
             "firstSpeaker": self.first_speaker
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as response:
-                response_data = await response.json()
-                join_url = response_data.get('joinUrl')
-                return join_url
+        async with self._http.post(url, json=payload) as response:
+            response_data = await response.json()
+            join_url = response_data.get('joinUrl')
+            return join_url
 
     async def disconnect(self):
         if self.ws:
             self.logger.info("Closing websocket connection to Ultravox")
             await self.ws.close()
             self.ws = None
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
 
     async def update_session(self):
         return True
@@ -89,29 +122,31 @@ class UltraVoxClient():
         """Send a message through the WebSocket connection synchronously."""
         self.logger.info(f"Sending message to Ultravox: {message}")
 
-        conversation_event = {
-            "type": "input_text_message",
-            "text": message
-        }
+        conversation_event = _INPUT_TEXT_PREFIX + orjson.dumps(message) + _INPUT_TEXT_SUFFIX
 
-        await self.ws.send(json.dumps(conversation_event))
+        await self.ws.send(conversation_event.decode())
 
         full_response = ""
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
         try:
             while True:
                 try:
                     response = await self.ws.recv()
-                    data = json.loads(response)
+                    # Only the final transcript frame matters; skip the JSON
+                    # parse on everything else unless debug logging is on
+                    if not debug_enabled and '"final": true' not in response and '"final":true' not in response:
+                        continue
+                    data = orjson.loads(response)
                     event_type = data.get("type")
                     if event_type in ULTRAVOX_OBSERVED_EVENTS:
-                        self.logger.debug(f"Received JSON response from Ultravox: {data}")
+                        self.logger.debug('Received JSON response from Ultravox: %s', data)
                         is_final = bool(data.get("final", False))
                         if is_final:
                             full_response = data.get("text", "")
                             break
                     else:
-                        self.logger.debug(f"Received ignored event from Ultravox: {event_type}")
-                except json.JSONDecodeError:
+                        self.logger.debug('Received ignored event from Ultravox: %s', event_type)
+                except orjson.JSONDecodeError:
                     self.logger.error("Failed to decode JSON response")
                     data = {}
         except websockets.exceptions.ConnectionClosed:
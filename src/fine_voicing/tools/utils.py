@@ -1,24 +1,51 @@
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime
 
+# QueueListeners draining log records to disk, one per configured logger
+_listeners = []
+
+# Default log file templates per logger kind
+_FILE_PATTERNS = {
+    'test-case': 'test_case_{test_case_name}_{timestamp}.log',
+    'session': 'test_session_{timestamp}.log',
+}
+
+# Whether the logs directory has been created this process
+_logs_dir_created = False
+
 # Configure logging
 def setup_logging(name: str, **kwargs):
     level_name = logging.DEBUG if kwargs.get('debug', False) else logging.INFO
     logger = logging.getLogger(name)
+
+    # Loggers are process-wide: configuring the same name twice would stack
+    # duplicate handlers and write every record more than once
+    if logger.handlers:
+        logger.setLevel(level_name)
+        return logger
+
     logger.setLevel(level_name)
-    
-    # Create logs directory if it doesn't exist
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
-    
+    logger.propagate = False
+
+    # Create logs directory on first use only; one logger is set up per test
+    # case, so skip the syscall on every call after the first
+    global _logs_dir_created
+    if not _logs_dir_created:
+        os.makedirs('logs', exist_ok=True)
+        _logs_dir_created = True
+
     # File handler with timestamp in filename
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-    # Use custom file name pattern if provided, otherwise use default
-    file_pattern = kwargs.get('file_pattern', 'test_case_{test_case_name}_{timestamp}.log' if type == 'test-case' else 'test_session_{timestamp}.log')
+    # Use custom file name pattern if provided, otherwise pick the default
+    # for the requested logger kind (the old `type == 'test-case'` check
+    # compared the builtin, so the test-case default was unreachable)
+    file_pattern = kwargs.get('file_pattern') or _FILE_PATTERNS[kwargs.get('kind', 'session')]
     file_name = f"logs/{file_pattern.format(timestamp=timestamp, test_case_name=kwargs.get('test_case_name', ''))}"
-    file_handler = logging.FileHandler(file_name)
+    file_handler = logging.FileHandler(file_name, delay=True)
     file_handler.setLevel(level_name)
     
     # Stream handler for console output
@@ -35,15 +62,26 @@ def setup_logging(name: str, **kwargs):
     if kwargs.get('console_output', True):
         stream_handler.setFormatter(formatter)
     
-    # Add handlers to logger
-    logger.addHandler(file_handler)
+    # File writes go through a queue drained by a background listener thread,
+    # so emitting a record never blocks the event loop on disk I/O
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    _listeners.append(listener)
+
     if kwargs.get('console_output', True):
         logger.addHandler(stream_handler)
-    
+
     # Add any additional handlers from kwargs
     extra_handlers = kwargs.get('handlers', [])
     for handler in extra_handlers:
         handler.setFormatter(formatter)
         logger.addHandler(handler)
-    
-    return logger
\ No newline at end of file
+
+    return logger
+
+def shutdown_logging():
+    """Stop the queue listeners, flushing any pending records to disk."""
+    while _listeners:
+        _listeners.pop().stop()
\ No newline at end of file
@@ -31,7 +31,20 @@ class VoiceAIBaseTool(BaseTool):
             str: The AI's response
         """
         return f"{role_name}: {self.voiceai_thread.send_message(last_message)}"
-    
+
+    async def _arun(self, role_name: str, last_message: str) -> str:
+        """Run the tool without blocking the caller's event loop.
+
+        Args:
+            role_name (str): The name of the role to play in the conversation
+            last_message (str): The last message in the conversation
+
+        Returns:
+            str: The AI's response
+        """
+        return f"{role_name}: {await self.voiceai_thread.send_message_async(last_message)}"
+
+
 class OpenAIVoiceAI(VoiceAIBaseTool):
     name: str = "OpenAI Voice AI API Client"
     description: str = "Use the OpenAI Voice AI API to generate a message"
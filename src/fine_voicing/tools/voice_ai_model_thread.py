@@ -33,39 +33,57 @@ class VoiceAIModelThread:
 
     def _run_event_loop(self):
         """Run the event loop in the dedicated thread."""
-        self._loop = asyncio.new_event_loop()
+        try:
+            import uvloop
+            self._loop = uvloop.new_event_loop()
+        except ImportError:
+            self._loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self._loop)
         self._loop_initialized.set()  # Signal that the loop is initialized
         self._loop.run_forever()
 
     def _run_coroutine(self, coro):
-        """Helper method to run coroutines in the dedicated event loop."""
-        if threading.current_thread() is self._thread:
-            return self._loop.run_until_complete(coro)
+        """Run a coroutine on the dedicated event loop and wait for its result.
+
+        Always goes through run_coroutine_threadsafe: calling
+        run_until_complete on the already-running loop would raise
+        RuntimeError, and coroutines on the loop thread itself should simply
+        be awaited.
+        """
         future = asyncio.run_coroutine_threadsafe(coro, self._loop)
         return future.result()
 
     def send_message(self, message: str) -> str:
         """Thread-safe method to send messages."""
-        async def _send():
-            if self.client is None:
-                await self._initialize()
+        return self._run_coroutine(self._send(message))
+
+    async def send_message_async(self, message: str) -> str:
+        """Awaitable variant of send_message for callers running on another event loop.
+
+        The coroutine is scheduled on the dedicated thread's loop and awaited
+        without blocking the caller's loop, so concurrent test cases keep running
+        while the websocket round-trip is in flight.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._send(message), self._loop)
+        return await asyncio.wrap_future(future)
 
-            retries = 0
-            async_sleep = 1
+    async def _send(self, message: str) -> str:
+        if self.client is None:
+            await self._initialize()
+
+        retries = 0
+        async_sleep = 1
+        response = await self.client.send_message(message)
+        while response == '<Error>' and retries < 3:
             response = await self.client.send_message(message)
-            while response == '<Error>' and retries < 3:
-                response = await self.client.send_message(message)
-                self.logger.error(f"Error generating message from Voice AI Model after {retries} retries. Throttling...")
-                retries += 1
-                await asyncio.sleep(async_sleep)
-                async_sleep *= 2
-
-            if retries == 3:
-                raise Exception(f"Error generating message from Voice AI Model after 3 retries")
-            return response
-        
-        return self._run_coroutine(_send())
+            self.logger.error(f"Error generating message from Voice AI Model after {retries} retries. Throttling...")
+            retries += 1
+            await asyncio.sleep(async_sleep)
+            async_sleep *= 2
+
+        if retries == 3:
+            raise Exception(f"Error generating message from Voice AI Model after 3 retries")
+        return response
 
     async def _initialize(self):
         """Initialize the AI client."""
@@ -4,6 +4,14 @@ from argparse import ArgumentParser
 from fine_voicing.tools.constants import LOGGER_MAIN, LOGGER_SESSION_FILE_PATTERN
 import asyncio
 
+try:
+    # uvloop speeds up the main event loop too, not just the client threads;
+    # fall back to the default loop where it isn't available
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 parser = ArgumentParser()
 parser.add_argument('-d', '--debug', action='store_true',
                     help='Enable debug logging level')
@@ -13,8 +21,11 @@ async def main():
     logger = utils.setup_logging(LOGGER_MAIN, debug=args.debug, file_pattern=LOGGER_SESSION_FILE_PATTERN, console_output=True)
 
     runner = TestRunner(debug=args.debug)
-    transcripts = await runner.run_test_cases()
-    logger.info(f"{len(transcripts)} test cases completed")
+    try:
+        transcripts = await runner.run_test_cases()
+        logger.info(f"{len(transcripts)} test cases completed")
+    finally:
+        utils.shutdown_logging()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file